@@ -1,7 +1,10 @@
 import os
+import secrets
+import time
+from functools import wraps
 import cv2
 import numpy as np
-from flask import Flask, render_template, Response, request, jsonify
+from flask import Flask, render_template, Response, request, jsonify, g
 from io import BytesIO
 import soundfile as sf
 
@@ -9,6 +12,7 @@ import soundfile as sf
 from scripts import face_recognition_module as face_module
 from scripts import voice_encrypt as voice_module
 from scripts import encryption_module
+from scripts import session_module
 
 # --- App & Path Configuration ---
 app = Flask(__name__)
@@ -30,6 +34,12 @@ VOICE_KEY_FILE = os.path.join(KEYS_DIR, "voice_key.key")
 FACE_ENC_FILE = os.path.join(FACE_ENCODINGS_DIR, "user_face.npy.enc")
 FACE_KEY_FILE = os.path.join(KEYS_DIR, "secret.key")
 
+# Session configuration (single registered user per installation)
+USER_ID = "default_user"
+SESSION_COOKIE = "bio_session"
+DEVICE_COOKIE = "bio_device"
+DEVICE_COOKIE_MAX_AGE = 365 * 24 * 60 * 60
+
 # Initialize global video capture
 video_capture = None
 
@@ -43,6 +53,85 @@ def get_video_capture():
         video_capture = cv2.VideoCapture(0)
     return video_capture
 
+
+def get_device_id():
+    """Returns the id sessions are bound to, taken from a server-issued httpOnly cookie.
+
+    A new id is generated for browsers that do not have one yet; it is set on
+    the response by `set_device_cookie`.
+    """
+    if "device_id" not in g:
+        g.device_id = request.cookies.get(DEVICE_COOKIE)
+        if not g.device_id:
+            g.device_id = secrets.token_urlsafe(32)
+            g.new_device_id = True
+    return g.device_id
+
+
+@app.after_request
+def set_device_cookie(response):
+    if g.get("new_device_id"):
+        response.set_cookie(DEVICE_COOKIE, g.device_id, max_age=DEVICE_COOKIE_MAX_AGE,
+                            httponly=True, samesite="Strict")
+    return response
+
+
+def session_response(result, method):
+    """Sets a fresh session cookie on a successful verification result.
+
+    Still-active factors of an existing session are carried over with their
+    original match time, so verifying face and then voice yields a fused
+    session covering both. The new session always runs a full TTL from this
+    match; carried factors lapse on their own schedule.
+    """
+    factors = {method: time.time()}
+    claims, _ = session_module.validate_session(
+        request.cookies.get(SESSION_COOKIE), get_device_id())
+    if claims is not None:
+        factors = dict(session_module.active_factors(claims), **factors)
+        session_module.revoke_session(claims)
+    token = session_module.issue_session(USER_ID, get_device_id(), factors)
+    expires_at = int(factors[method]) + session_module.SESSION_TTL_SECONDS
+    response = jsonify(dict(result, methods=sorted(factors), expires_at=expires_at))
+    response.set_cookie(SESSION_COOKIE, token, max_age=max(0, expires_at - int(time.time())),
+                        httponly=True, samesite="Strict")
+    return response
+
+
+def require_session(sensitive=False, methods=None, only_if=None):
+    """Protects a route with a session token instead of a fresh biometric match.
+
+    Sensitive routes only accept sessions whose last biometric match is recent
+    (step-up); `methods` restricts the route to sessions covering those factors.
+    When `only_if` is given, the check is skipped while it returns False.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if only_if is not None and not only_if():
+                return view(*args, **kwargs)
+            claims, reason = session_module.validate_session(
+                request.cookies.get(SESSION_COOKIE), get_device_id(),
+                sensitive=sensitive, required_methods=methods)
+            if claims is None:
+                message = "Verification required."
+                if reason == "step_up_required":
+                    message = f"Verify your {' and '.join(methods or ['face or voice'])} again first."
+                return jsonify({"success": False, "message": message,
+                                "reason": reason}), 401
+            g.session_claims = claims
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def face_enrolled():
+    return os.path.exists(FACE_ENC_FILE)
+
+
+def voice_enrolled():
+    return os.path.exists(VOICE_ENC_FILE) and os.path.exists(VOICE_KEY_FILE)
+
 # --- Face Biometrics Logic (No changes needed here) ---
 
 
@@ -131,6 +220,7 @@ def video_feed(mode):
 
 
 @app.route('/register_face', methods=['POST'])
+@require_session(sensitive=True, methods=["face"], only_if=face_enrolled)
 def register_face():
     # ... (function is unchanged)
     cap = get_video_capture()
@@ -153,7 +243,35 @@ def register_face():
     return jsonify({"success": True, "message": "Face registered and encrypted successfully!"})
 
 
+@app.route('/verify_face', methods=['POST'])
+def verify_face():
+    if not os.path.exists(FACE_ENC_FILE):
+        return jsonify({"success": False, "message": "No registered face found."})
+    cap = get_video_capture()
+    success, frame = cap.read()
+    if not success:
+        return jsonify({"success": False, "message": "Could not capture frame."})
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    face_locations = face_module.face_recognition.face_locations(rgb_frame)
+    if not face_locations:
+        return jsonify({"success": False, "message": "No face detected in the frame."})
+    try:
+        known_encoding = encryption_module.decrypt_npy_file_to_array(
+            FACE_ENC_FILE, FACE_KEY_FILE)
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error: {str(e)}"})
+    face_encodings = face_module.face_recognition.face_encodings(
+        rgb_frame, face_locations)
+    for face_encoding in face_encodings:
+        matches = face_module.face_recognition.compare_faces(
+            [known_encoding], face_encoding)
+        if True in matches:
+            return session_response({"success": True, "message": "Face verified."}, "face")
+    return jsonify({"success": False, "message": "Face did not match."})
+
+
 @app.route('/register_voice', methods=['POST'])
+@require_session(sensitive=True, methods=["voice"], only_if=voice_enrolled)
 def register_voice():
     audio_file = request.files.get('audio_data')
     if not audio_file:
@@ -184,6 +302,8 @@ def verify_voice():
         return jsonify({"success": False, "message": "Audio must be WAV format."})
     try:
         result = process_voice_verification(audio_file.read())
+        if result["success"]:
+            return session_response(result, "voice")
         return jsonify(result)
     except Exception as e:
         return jsonify({"success": False, "message": f"Error: {str(e)}"})
@@ -203,6 +323,25 @@ def stop_video():
     return jsonify({"success": False, "message": "Camera was not active."})
 
 
+@app.route('/session', methods=['GET'])
+@require_session()
+def session_status():
+    """Cheap check for downstream actions: validates the token, no biometrics involved."""
+    claims = g.session_claims
+    factors = session_module.active_factors(claims)
+    return jsonify({"success": True, "user": claims["sub"], "methods": sorted(factors),
+                    "auth_times": factors, "expires_at": claims["exp"]})
+
+
+@app.route('/session/revoke', methods=['POST'])
+@require_session()
+def revoke_session():
+    session_module.revoke_session(g.session_claims)
+    response = jsonify({"success": True, "message": "Session revoked."})
+    response.delete_cookie(SESSION_COOKIE)
+    return response
+
+
 # --- Main Execution ---
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,84 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+import app as app_module
+from scripts import voice_encrypt as voice_module
+
+
+def make_wav_bytes(seconds=3.0, sr=16000, seed=0):
+    """Synthetic voice-like clip (harmonics + noise) in WAV format."""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, seconds, int(sr * seconds), endpoint=False)
+    audio = sum(np.sin(2 * np.pi * f * t) / (i + 1)
+                for i, f in enumerate((140, 280, 420, 560)))
+    audio = 0.3 * audio + 0.02 * rng.standard_normal(t.size)
+    bio = io.BytesIO()
+    sf.write(bio, audio.astype(np.float32), sr, format="WAV")
+    return bio.getvalue()
+
+
+def post_voice(client, audio_bytes):
+    data = {"audio_data": (io.BytesIO(audio_bytes), "recorded.wav", "audio/wav")}
+    response = client.post("/verify_voice", data=data,
+                           content_type="multipart/form-data")
+    assert response.get_json()["success"], response.get_json()
+    return response
+
+
+def run_without_sessions(n_requests, audio_bytes):
+    """Every authenticated request re-runs the full MFCC + DTW voice match."""
+    client = app_module.app.test_client()
+    start = time.process_time()
+    for _ in range(n_requests):
+        post_voice(client, audio_bytes)
+    return time.process_time() - start
+
+
+def run_with_sessions(n_requests, audio_bytes):
+    """One voice match sets the session cookie; requests then hit a require_session route."""
+    client = app_module.app.test_client()
+    start = time.process_time()
+    post_voice(client, audio_bytes)
+    for _ in range(n_requests):
+        response = client.get("/session")
+        assert response.status_code == 200, response.get_json()
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Verification CPU per authenticated request, with and without sessions.")
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    audio_bytes = make_wav_bytes()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the load test away from the real registered voice template.
+        app_module.VOICE_ENC_FILE = os.path.join(tmp, "encrypted_voice.mfcc")
+        app_module.VOICE_KEY_FILE = os.path.join(tmp, "voice_key.key")
+        # The voice pipeline logs every match; keep the report readable.
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not voice_module.register_voice_from_wav_bytes(
+                    audio_bytes, app_module.VOICE_ENC_FILE, app_module.VOICE_KEY_FILE):
+                raise SystemExit("Voice registration failed.")
+            post_voice(app_module.app.test_client(), audio_bytes)  # warm-up
+            cpu_plain = run_without_sessions(args.requests, audio_bytes)
+            cpu_session = run_with_sessions(args.requests, audio_bytes)
+
+    print(f"Authenticated requests: {args.requests}")
+    print(f"Without sessions: {cpu_plain:.3f}s CPU total, "
+          f"{cpu_plain / args.requests * 1e3:.3f} ms/request")
+    print(f"With sessions:    {cpu_session:.3f}s CPU total, "
+          f"{cpu_session / args.requests * 1e3:.3f} ms/request")
+    print(f"Speed-up: {cpu_plain / cpu_session:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
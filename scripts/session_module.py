@@ -0,0 +1,160 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+
+# Signing secret for session tokens. Set BIOMETRIC_SESSION_SECRET to keep
+# sessions valid across restarts; otherwise a random per-process secret is used.
+SESSION_SECRET = os.environ.get(
+    "BIOMETRIC_SESSION_SECRET", "").encode() or os.urandom(32)
+
+# How long a session token stays valid after a successful biometric match.
+SESSION_TTL_SECONDS = int(os.environ.get("BIOMETRIC_SESSION_TTL", 15 * 60))
+
+# Sensitive actions require the biometric match to be more recent than this.
+STEP_UP_MAX_AGE_SECONDS = int(os.environ.get("BIOMETRIC_STEP_UP_MAX_AGE", 60))
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: bytes, secret: bytes) -> bytes:
+    return _b64encode(hmac.new(secret, payload, hashlib.sha256).digest()).encode("ascii")
+
+
+def _device_digest(device_id: str, secret: bytes) -> str:
+    """Keyed hash of the device id, so the token never carries it in readable form."""
+    return _b64encode(hmac.new(secret, b"device:" + device_id.encode("utf-8"),
+                               hashlib.sha256).digest())
+
+
+###########################
+# Revocation Store
+###########################
+
+class RevocationStore:
+    """In-memory set of revoked session ids, each kept only until it would expire anyway."""
+
+    def __init__(self):
+        self._revoked = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, session_id: str, expires_at: float):
+        with self._lock:
+            self._revoked[session_id] = expires_at
+
+    def is_revoked(self, session_id: str) -> bool:
+        return session_id in self._revoked
+
+    def purge_expired(self, now: float = None) -> int:
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [sid for sid, exp in self._revoked.items() if exp <= now]
+            for sid in expired:
+                del self._revoked[sid]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+revocation_store = RevocationStore()
+
+
+###########################
+# Issue & Validate
+###########################
+
+def issue_session(user_id: str, device_id: str, factors: dict, ttl: int = None,
+                  secret: bytes = None) -> str:
+    """Issue a signed session token after a successful face/voice verification.
+
+    `factors` maps each matched biometric factor to the time of its match,
+    e.g. {"face": t1, "voice": t2}. The token expires `ttl` seconds after the
+    newest match; older factors lapse on their own (see `active_factors`).
+    """
+    if not factors:
+        raise ValueError("A session needs at least one verified factor.")
+    secret = secret or SESSION_SECRET
+    ttl = SESSION_TTL_SECONDS if ttl is None else ttl
+    amr = {method: int(auth_time) for method, auth_time in factors.items()}
+    claims = {
+        "sid": uuid.uuid4().hex,
+        "sub": user_id,
+        "dev": _device_digest(device_id, secret),
+        "amr": amr,
+        "iat": int(time.time()),
+        "exp": max(amr.values()) + ttl,
+    }
+    payload = _b64encode(json.dumps(
+        claims, separators=(",", ":"), sort_keys=True).encode("utf-8")).encode("ascii")
+    return (payload + b"." + _sign(payload, secret)).decode("ascii")
+
+
+def active_factors(claims: dict, now: float = None) -> dict:
+    """Factors of a session whose match is still within the session lifetime."""
+    now = time.time() if now is None else now
+    ttl = claims["exp"] - max(claims["amr"].values())
+    return {method: auth_time for method, auth_time in claims["amr"].items()
+            if auth_time + ttl > now}
+
+
+def validate_session(token: str, device_id: str, sensitive: bool = False,
+                     required_methods=None, store: RevocationStore = None,
+                     secret: bytes = None):
+    """Validate a session token without touching any biometric data.
+
+    Returns (claims, None) when the token is usable, or (None, reason) where
+    reason is "invalid", "expired", "revoked", "device_mismatch" or "step_up_required".
+    Factors whose match is older than the session lifetime count as absent.
+    Sensitive checks need a recent match of every required factor, or of any
+    factor when none are required.
+    """
+    secret = secret or SESSION_SECRET
+    try:
+        payload, signature = token.encode("ascii").split(b".")
+        if not hmac.compare_digest(signature, _sign(payload, secret)):
+            return None, "invalid"
+        claims = json.loads(_b64decode(payload.decode("ascii")))
+    except (AttributeError, ValueError, TypeError):
+        return None, "invalid"
+    if not isinstance(claims, dict) or not claims.get("amr") \
+            or not isinstance(claims["amr"], dict):
+        return None, "invalid"
+
+    now = time.time()
+    if claims.get("exp", 0) <= now:
+        return None, "expired"
+    store = revocation_store if store is None else store
+    if store.is_revoked(claims.get("sid")):
+        return None, "revoked"
+    if not hmac.compare_digest(str(claims.get("dev", "")), _device_digest(device_id, secret)):
+        return None, "device_mismatch"
+
+    factors = active_factors(claims, now)
+    if required_methods and not set(required_methods) <= set(factors):
+        return None, "step_up_required"
+    if sensitive:
+        if required_methods:
+            last_match = min(factors[m] for m in required_methods)
+        else:
+            last_match = max(factors.values())
+        if now - last_match > STEP_UP_MAX_AGE_SECONDS:
+            return None, "step_up_required"
+    return claims, None
+
+
+def revoke_session(claims: dict, store: RevocationStore = None):
+    """Revoke a validated session until its natural expiry."""
+    store = revocation_store if store is None else store
+    store.revoke(claims["sid"], claims["exp"])
+    store.purge_expired()
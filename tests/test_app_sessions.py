@@ -0,0 +1,155 @@
+import contextlib
+import io
+import os
+import re
+import tempfile
+import time
+import unittest
+
+from scripts import session_module
+
+try:
+    import app as app_module
+    from scripts import voice_encrypt as voice_module
+    from scripts.session_load_test import make_wav_bytes
+except ImportError:  # face/voice stack (cv2, face_recognition, librosa) not installed
+    app_module = None
+
+
+@unittest.skipIf(app_module is None, "app dependencies are not installed")
+class AppSessionTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.audio_bytes = make_wav_bytes()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_paths = {name: getattr(app_module, name) for name in
+                            ("VOICE_ENC_FILE", "VOICE_KEY_FILE", "FACE_ENC_FILE")}
+        app_module.VOICE_ENC_FILE = os.path.join(self.tmp.name, "encrypted_voice.mfcc")
+        app_module.VOICE_KEY_FILE = os.path.join(self.tmp.name, "voice_key.key")
+        app_module.FACE_ENC_FILE = os.path.join(self.tmp.name, "user_face.npy.enc")
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        for name, path in self.saved_paths.items():
+            setattr(app_module, name, path)
+        self.tmp.cleanup()
+
+    # --- helpers ---
+
+    def enroll_voice(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(voice_module.register_voice_from_wav_bytes(
+                self.audio_bytes, app_module.VOICE_ENC_FILE, app_module.VOICE_KEY_FILE))
+
+    def post_audio(self, endpoint):
+        data = {"audio_data": (io.BytesIO(self.audio_bytes), "recorded.wav", "audio/wav")}
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.client.post(endpoint, data=data, content_type="multipart/form-data")
+
+    def device_id(self):
+        if self.client.get_cookie(app_module.DEVICE_COOKIE) is None:
+            self.client.get("/session")
+        return self.client.get_cookie(app_module.DEVICE_COOKIE).value
+
+    def set_session(self, factors):
+        token = session_module.issue_session(app_module.USER_ID, self.device_id(), factors)
+        self.client.set_cookie(app_module.SESSION_COOKIE, token)
+        return token
+
+    def session_reason(self):
+        response = self.client.get("/session")
+        self.assertEqual(response.status_code, 401)
+        return response.get_json()["reason"]
+
+    # --- tests ---
+
+    def test_first_request_sets_httponly_device_cookie(self):
+        response = self.client.get("/session")
+        cookie = [c for c in response.headers.getlist("Set-Cookie")
+                  if c.startswith(app_module.DEVICE_COOKIE + "=")]
+        self.assertEqual(len(cookie), 1)
+        self.assertIn("HttpOnly", cookie[0])
+
+    def test_voice_verification_sets_session_cookie_only(self):
+        self.enroll_voice()
+        response = self.post_audio("/verify_voice")
+        result = response.get_json()
+        self.assertTrue(result["success"])
+        self.assertEqual(result["methods"], ["voice"])
+        token = self.client.get_cookie(app_module.SESSION_COOKIE).value
+        self.assertNotIn(token, response.get_data(as_text=True))
+
+        status = self.client.get("/session").get_json()
+        self.assertEqual(status["methods"], ["voice"])
+        self.assertEqual(set(status["auth_times"]), {"voice"})
+
+    def test_stolen_session_cookie_without_device_cookie(self):
+        token = self.set_session({"face": time.time()})
+        thief = app_module.app.test_client()
+        thief.set_cookie(app_module.SESSION_COOKIE, token)
+        response = thief.get("/session", headers={"X-Device-Id": self.device_id()})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()["reason"], "device_mismatch")
+
+    def test_face_then_voice_fuses_and_revokes_old_session(self):
+        self.enroll_voice()
+        old_token = self.set_session({"face": time.time()})
+        result = self.post_audio("/verify_voice").get_json()
+        self.assertEqual(result["methods"], ["face", "voice"])
+        self.assertEqual(self.client.get("/session").get_json()["methods"], ["face", "voice"])
+
+        self.client.set_cookie(app_module.SESSION_COOKIE, old_token)
+        self.assertEqual(self.session_reason(), "revoked")
+
+    def test_new_match_on_old_session_gets_full_ttl(self):
+        self.enroll_voice()
+        ttl = session_module.SESSION_TTL_SECONDS
+        for age in (14 * 60, ttl - 1):
+            with self.subTest(face_age=age):
+                self.set_session({"face": time.time() - age})
+                response = self.post_audio("/verify_voice")
+                self.assertGreaterEqual(response.get_json()["expires_at"], time.time() + ttl - 5)
+                cookie = [c for c in response.headers.getlist("Set-Cookie")
+                          if c.startswith(app_module.SESSION_COOKIE + "=")][0]
+                max_age = int(re.search(r"Max-Age=(\d+)", cookie).group(1))
+                self.assertGreaterEqual(max_age, ttl - 5)
+
+    def test_revoke_then_reuse(self):
+        token = self.set_session({"face": time.time()})
+        response = self.client.post("/session/revoke")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.client.get_cookie(app_module.SESSION_COOKIE))
+
+        self.client.set_cookie(app_module.SESSION_COOKIE, token)
+        self.assertEqual(self.session_reason(), "revoked")
+
+    def test_first_voice_enrollment_needs_no_session(self):
+        response = self.post_audio("/register_voice")
+        self.assertTrue(response.get_json()["success"])
+
+    def test_voice_re_enrollment_requires_recent_voice_match(self):
+        self.enroll_voice()
+        stale = time.time() - session_module.STEP_UP_MAX_AGE_SECONDS - 10
+        for factors, reason in [(None, "invalid"),
+                                ({"face": time.time()}, "step_up_required"),
+                                ({"voice": stale}, "step_up_required")]:
+            with self.subTest(factors=factors):
+                if factors is None:
+                    self.client.delete_cookie(app_module.SESSION_COOKIE)
+                else:
+                    self.set_session(factors)
+                response = self.post_audio("/register_voice")
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response.get_json()["reason"], reason)
+
+        self.set_session({"voice": time.time()})
+        response = self.post_audio("/register_voice")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import base64
+import json
+import time
+import unittest
+
+from scripts import session_module
+
+SECRET = b"test-secret"
+DEVICE = "device-a"
+
+
+def issue(factors=None, ttl=None, device_id=DEVICE):
+    now = time.time()
+    return session_module.issue_session(
+        "user", device_id, factors or {"face": now}, ttl=ttl, secret=SECRET)
+
+
+def validate(token, device_id=DEVICE, store=None, **kwargs):
+    store = session_module.RevocationStore() if store is None else store
+    return session_module.validate_session(
+        token, device_id, store=store, secret=SECRET, **kwargs)
+
+
+def decode_payload(token):
+    payload = token.split(".")[0]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+
+class IssueSessionTests(unittest.TestCase):
+
+    def test_valid_token_round_trips(self):
+        claims, reason = validate(issue())
+        self.assertIsNone(reason)
+        self.assertEqual(claims["sub"], "user")
+        self.assertEqual(set(claims["amr"]), {"face"})
+
+    def test_payload_does_not_expose_device_id(self):
+        self.assertNotIn(DEVICE, json.dumps(decode_payload(issue())))
+
+    def test_dev_claim_is_not_a_usable_device_id(self):
+        token = issue()
+        self.assertEqual(validate(token, device_id=decode_payload(token)["dev"]),
+                         (None, "device_mismatch"))
+
+    def test_expiry_follows_newest_factor(self):
+        now = time.time()
+        claims, _ = validate(issue({"face": now - 100, "voice": now}, ttl=300))
+        self.assertEqual(claims["exp"], int(now) + 300)
+
+    def test_requires_a_factor(self):
+        with self.assertRaises(ValueError):
+            session_module.issue_session("user", DEVICE, {}, secret=SECRET)
+
+
+class ValidateSessionTests(unittest.TestCase):
+
+    def test_expired(self):
+        self.assertEqual(validate(issue(ttl=-1)), (None, "expired"))
+
+    def test_stale_carried_over_factor_counts_as_absent(self):
+        now = time.time()
+        token = issue({"face": now - 120, "voice": now}, ttl=60)
+        claims, reason = validate(token)
+        self.assertIsNone(reason)
+        self.assertEqual(set(session_module.active_factors(claims)), {"voice"})
+        self.assertEqual(validate(token, required_methods=["face"]),
+                         (None, "step_up_required"))
+
+    def test_device_mismatch(self):
+        self.assertEqual(validate(issue(), device_id="device-b"), (None, "device_mismatch"))
+
+    def test_wrong_secret(self):
+        token = session_module.issue_session("user", DEVICE, {"face": time.time()},
+                                             secret=b"other")
+        self.assertEqual(validate(token), (None, "invalid"))
+
+    def test_tampered_payload(self):
+        payload, signature = issue().split(".")
+        self.assertEqual(validate(payload[:-1] + "A" + "." + signature), (None, "invalid"))
+
+    def test_malformed_tokens(self):
+        for token in [None, "", "abc", "a.b.c", "abc.é", "é.abc", "abc.", ".abc"]:
+            with self.subTest(token=token):
+                self.assertEqual(validate(token), (None, "invalid"))
+
+    def test_signed_non_dict_payload(self):
+        for value in ([], "claims", {"amr": ["face"]}, {"amr": {}}):
+            payload = base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=")
+            token = payload + b"." + session_module._sign(payload, SECRET)
+            with self.subTest(value=value):
+                self.assertEqual(validate(token.decode()), (None, "invalid"))
+
+    def test_required_methods(self):
+        token = issue({"face": time.time()})
+        self.assertEqual(validate(token, required_methods=["face", "voice"]),
+                         (None, "step_up_required"))
+        self.assertIsNone(validate(token, required_methods=["face"])[1])
+
+    def test_sensitive_needs_recent_match(self):
+        old = time.time() - session_module.STEP_UP_MAX_AGE_SECONDS - 10
+        self.assertEqual(validate(issue({"voice": old}), sensitive=True),
+                         (None, "step_up_required"))
+        self.assertIsNone(validate(issue(), sensitive=True)[1])
+
+    def test_sensitive_checks_each_required_factor(self):
+        now = time.time()
+        old = now - session_module.STEP_UP_MAX_AGE_SECONDS - 10
+        token = issue({"face": old, "voice": now})
+        self.assertIsNone(validate(token, sensitive=True)[1])
+        self.assertIsNone(validate(token, sensitive=True, required_methods=["voice"])[1])
+        self.assertEqual(validate(token, sensitive=True, required_methods=["face"]),
+                         (None, "step_up_required"))
+
+
+class RevocationStoreTests(unittest.TestCase):
+
+    def test_revoked_session_is_rejected(self):
+        store = session_module.RevocationStore()
+        token = issue()
+        claims, _ = validate(token, store=store)
+        session_module.revoke_session(claims, store=store)
+        self.assertEqual(validate(token, store=store), (None, "revoked"))
+        self.assertIsNone(validate(issue(), store=store)[1])
+
+    def test_purge_expired(self):
+        store = session_module.RevocationStore()
+        store.revoke("old", time.time() - 1)
+        store.revoke("live", time.time() + 60)
+        self.assertEqual(store.purge_expired(), 1)
+        self.assertFalse(store.is_revoked("old"))
+        self.assertTrue(store.is_revoked("live"))
+        self.assertEqual(len(store), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()